@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, send_file, Response, jsonify
+from flask import Flask, render_template, request, send_file, Response, jsonify, url_for
 from io import BytesIO
 import re
 import json
@@ -9,8 +9,22 @@ from urllib.parse import unquote
 import zipfile
 from hashlib import md5
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
+import time
+import threading
+import uuid
+import gzip
+from html import escape as html_escape
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from ebaysdk.trading import Connection as Trading
+from ebaysdk.exception import ConnectionError as EbayConnectionError
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # bez pakietu Brotli zostaje sam gzip
 
 app = Flask(__name__)
 
@@ -19,6 +33,34 @@ BRIGHTDATA_API_KEY = "98ffe329-7288-47d3-94ae-b2945e1db937"
 BRIGHTDATA_ZONE = "web_unlocker1"
 BRIGHTDATA_ENDPOINT = "https://api.brightdata.com/request"
 
+# ----------------- EBAY -----------------
+# EBAY_DOMAIN/EBAY_HTTPS pozwalają wskazać lokalny stub zamiast api.ebay.com
+EBAY_DOMAIN = os.environ.get("EBAY_DOMAIN", "api.ebay.com")
+EBAY_HTTPS = os.environ.get("EBAY_HTTPS", "1") != "0"
+EBAY_APPID = os.environ.get("EBAY_APPID", "")
+EBAY_DEVID = os.environ.get("EBAY_DEVID", "")
+EBAY_CERTID = os.environ.get("EBAY_CERTID", "")
+EBAY_TOKEN = os.environ.get("EBAY_TOKEN", "")
+EBAY_SITE_ID = "3"  # eBay UK
+EBAY_CATEGORY_ID = os.environ.get("EBAY_CATEGORY_ID", "")
+EBAY_POSTAL_CODE = os.environ.get("EBAY_POSTAL_CODE", "")
+EBAY_PAYMENT_PROFILE_ID = os.environ.get("EBAY_PAYMENT_PROFILE_ID", "")
+EBAY_RETURN_PROFILE_ID = os.environ.get("EBAY_RETURN_PROFILE_ID", "")
+EBAY_SHIPPING_PROFILE_ID = os.environ.get("EBAY_SHIPPING_PROFILE_ID", "")
+EBAY_BATCH_SIZE = 5  # AddItems przyjmuje max 5 ofert na wywołanie
+EBAY_MAX_WORKERS = int(os.environ.get("EBAY_MAX_WORKERS", "4"))
+EBAY_MAX_RETRIES = 3
+EBAY_RETRYABLE_ERRORS = {"10007"}  # błąd wewnętrzny eBay - krótki retry ma sens
+EBAY_QUOTA_ERROR = "518"  # limit wywołań API (godzinowy/dzienny) - retry nic nie da, stop zadania
+EBAY_TIMEOUT = 60
+EBAY_JOB_HEARTBEAT = 10  # co ile sekund działające zadanie odświeża heartbeat_at
+EBAY_JOB_STALE_AFTER = 120  # bez heartbeatu tyle sekund = proces padł, zadanie martwe
+
+# ----------------- HTTP CACHE / COMPRESSION -----------------
+STATIC_MAX_AGE = 31536000  # rok - pliki w /static mają hash w URL
+COMPRESS_MIN_SIZE = 500
+COMPRESS_MIMETYPES = {"text/html", "application/json", "text/css", "text/javascript", "application/javascript"}
+
 # ----------------- CACHE -----------------
 CACHE_DIR = "cache"
 UPLOADS_DIR = "uploads"
@@ -45,10 +87,16 @@ def init_db():
             notes TEXT,
             custom_description TEXT,
             price TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME
         )
     ''')
     
+    # Migracja: updated_at = ostatnia zmiana danych (ETag API), timestamp = ostatnie wyszukanie
+    c.execute('PRAGMA table_info(search_history)')
+    if 'updated_at' not in [row[1] for row in c.fetchall()]:
+        c.execute('ALTER TABLE search_history ADD COLUMN updated_at DATETIME')
+    
     # Tabela z dodatkowymi zdjęciami
     c.execute('''
         CREATE TABLE IF NOT EXISTS product_images (
@@ -60,15 +108,78 @@ def init_db():
         )
     ''')
     
+    # Tabela ze statusem publikacji na eBay (klucz idempotencji = SKU)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS ebay_listings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sku TEXT NOT NULL UNIQUE,
+            asin TEXT NOT NULL,
+            item_id TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            error TEXT,
+            job_id TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Migracja: job_id w ebay_listings (bazy sprzed publikacji w tle)
+    c.execute('PRAGMA table_info(ebay_listings)')
+    if 'job_id' not in [row[1] for row in c.fetchall()]:
+        c.execute('ALTER TABLE ebay_listings ADD COLUMN job_id TEXT')
+    
+    # Tabela z zadaniami publikacji (uruchamiane w tle)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS ebay_publish_jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'running',
+            published INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            skipped INTEGER DEFAULT 0,
+            elapsed_seconds REAL,
+            listings_per_minute REAL,
+            error TEXT,
+            started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            heartbeat_at DATETIME,
+            finished_at DATETIME
+        )
+    ''')
+    
+    # Migracja: heartbeat_at w ebay_publish_jobs
+    c.execute('PRAGMA table_info(ebay_publish_jobs)')
+    if 'heartbeat_at' not in [row[1] for row in c.fetchall()]:
+        c.execute('ALTER TABLE ebay_publish_jobs ADD COLUMN heartbeat_at DATETIME')
+    
+    # Zadania osierocone przez restart/padnięcie procesu
+    expire_stale_publish_jobs(c)
+    
     conn.commit()
     conn.close()
 
+def expire_stale_publish_jobs(c):
+    """Zadania 'running' bez heartbeatu (proces padł) -> error, ich oferty 'publishing' -> failed"""
+    now = datetime.now()
+    c.execute('''
+        SELECT id FROM ebay_publish_jobs
+        WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?
+    ''', (now - timedelta(seconds=EBAY_JOB_STALE_AFTER),))
+    stale = [row[0] for row in c.fetchall()]
+    
+    error = 'Job interrupted (no heartbeat - process stopped)'
+    for job_id in stale:
+        c.execute("UPDATE ebay_publish_jobs SET status = 'error', error = ?, finished_at = ? WHERE id = ?",
+                  (error, now, job_id))
+        c.execute("UPDATE ebay_listings SET status = 'failed', error = ? WHERE job_id = ? AND status = 'publishing'",
+                  (error, job_id))
+    return stale
+
 init_db()
 
 def save_to_history_db(asin, title=None, image_url=None, sku=None, price=None):
     """Zapisz lub zaktualizuj wpis w historii"""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
+    now = datetime.now()
     try:
         # Sprawdź czy istnieje
         c.execute('SELECT id FROM search_history WHERE asin = ?', (asin,))
@@ -79,21 +190,21 @@ def save_to_history_db(asin, title=None, image_url=None, sku=None, price=None):
             if sku is not None:
                 c.execute('''
                     UPDATE search_history 
-                    SET title = ?, image_url = ?, sku = ?, price = ?, timestamp = ?
+                    SET title = ?, image_url = ?, sku = ?, price = ?, timestamp = ?, updated_at = ?
                     WHERE asin = ?
-                ''', (title, image_url, sku, price, datetime.now(), asin))
+                ''', (title, image_url, sku, price, now, now, asin))
             else:
                 c.execute('''
                     UPDATE search_history 
-                    SET title = ?, image_url = ?, price = ?, timestamp = ?
+                    SET title = ?, image_url = ?, price = ?, timestamp = ?, updated_at = ?
                     WHERE asin = ?
-                ''', (title, image_url, price, datetime.now(), asin))
+                ''', (title, image_url, price, now, now, asin))
         else:
             # Dodaj nowy
             c.execute('''
-                INSERT INTO search_history (asin, title, image_url, sku, price, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (asin, title, image_url, sku, price, datetime.now()))
+                INSERT INTO search_history (asin, title, image_url, sku, price, timestamp, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (asin, title, image_url, sku, price, now, now))
         
         # Usuń najstarsze jeśli > MAX_HISTORY
         c.execute('''
@@ -133,7 +244,7 @@ def get_product_details(asin):
     """Pobierz szczegóły produktu z bazy"""
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    c.execute('SELECT asin, title, image_url, sku, notes, custom_description, price FROM search_history WHERE asin = ?', (asin,))
+    c.execute('SELECT asin, title, image_url, sku, notes, custom_description, price, COALESCE(updated_at, timestamp) FROM search_history WHERE asin = ?', (asin,))
     row = c.fetchone()
     conn.close()
     
@@ -145,7 +256,8 @@ def get_product_details(asin):
             'sku': row[3] or '',
             'notes': row[4] or '',
             'custom_description': row[5] or '',
-            'price': row[6] or ''
+            'price': row[6] or '',
+            'updated_at': row[7]
         }
     return None
 
@@ -154,7 +266,7 @@ def get_history_from_db(limit=50):
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
-        SELECT asin, title, image_url, sku, price, timestamp
+        SELECT asin, title, image_url, sku, price, timestamp, COALESCE(updated_at, timestamp)
         FROM search_history
         ORDER BY timestamp DESC
         LIMIT ?
@@ -169,7 +281,8 @@ def get_history_from_db(limit=50):
             'image': row[2],
             'sku': row[3] or '',
             'price': row[4] or '',
-            'timestamp': row[5]
+            'timestamp': row[5],
+            'updated_at': row[6]
         }
         for row in rows
     ]
@@ -372,6 +485,538 @@ def generate_listing_text(title, meta, bullets):
     lines.append("📦 Fast Dispatch from UK   |   🚚 Tracked Delivery Included")
     return "\n".join(lines)
 
+# ----------------- ebay publishing -----------------
+
+# (wzorzec, separator tysięcy, separator dziesiętny) - tylko jednoznaczne formaty
+PRICE_FORMATS = [
+    (re.compile(r'^\d{1,3}(,\d{3})+(\.\d{1,2})?$'), ',', '.'),   # 1,299 / 1,299.99
+    (re.compile(r'^\d+(\.\d{1,2})?$'), '', '.'),                 # 1299 / 12.99
+    (re.compile(r'^\d{1,3}(\.\d{3})+(,\d{1,2})?$'), '.', ','),   # 1.299 / 1.299,99
+    (re.compile(r'^\d+(,\d{1,2})?$'), '', ','),                  # 12,99
+]
+
+def parse_price(price):
+    """Zamień '£1,299.00' / '12,99' na Decimal (None jeśli brak lub niejednoznaczna)"""
+    # a-price-whole zwraca np. '1,299.' - końcowy separator bez groszy
+    digits = re.sub(r'[^\d.,]', '', price or '').rstrip('.,')
+    values = set()
+    for pattern, thousands, decimal in PRICE_FORMATS:
+        if pattern.match(digits):
+            normalized = digits.replace(thousands, '') if thousands else digits
+            values.add(Decimal(normalized.replace(decimal, '.')).quantize(Decimal('0.01')))
+    # To idzie prosto do StartPrice - nie zgadujemy
+    if len(values) != 1:
+        return None
+    value = values.pop()
+    return value if value > 0 else None
+
+def get_publish_candidates(asins=None):
+    """Pobierz produkty z historii, które mają SKU (SKU = klucz idempotencji)"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    query = '''
+        SELECT asin, title, sku, price, custom_description
+        FROM search_history
+        WHERE sku IS NOT NULL AND sku != ''
+    '''
+    params = []
+    if asins:
+        query += f" AND asin IN ({','.join('?' * len(asins))})"
+        params = list(asins)
+    c.execute(query + ' ORDER BY timestamp DESC', params)
+    rows = c.fetchall()
+    conn.close()
+
+    return [
+        {
+            'asin': row[0],
+            'title': row[1],
+            'sku': row[2],
+            'price': row[3] or '',
+            'custom_description': row[4] or ''
+        }
+        for row in rows
+    ]
+
+def get_published_skus():
+    """SKU już opublikowane na eBay - pomijane przy kolejnych wysyłkach"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT sku FROM ebay_listings WHERE status = 'published'")
+    rows = c.fetchall()
+    conn.close()
+    return {row[0] for row in rows}
+
+def set_listing_status(sku, asin, status, item_id=None, error=None, job_id=None):
+    """Zapisz status publikacji (wywoływane równolegle z wątków)"""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    c = conn.cursor()
+    try:
+        c.execute('''
+            INSERT INTO ebay_listings (sku, asin, item_id, status, attempts, error, job_id, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(sku) DO UPDATE SET
+                asin = excluded.asin,
+                item_id = COALESCE(excluded.item_id, ebay_listings.item_id),
+                status = excluded.status,
+                attempts = ebay_listings.attempts + excluded.attempts,
+                error = excluded.error,
+                job_id = COALESCE(excluded.job_id, ebay_listings.job_id),
+                updated_at = excluded.updated_at
+        ''', (sku, asin, item_id, status, 1 if status == 'publishing' else 0, error, job_id, datetime.now()))
+        conn.commit()
+    finally:
+        conn.close()
+
+def get_listing_statuses(job_id=None):
+    """Pobierz statusy publikacji na eBay (opcjonalnie tylko z jednego zadania)"""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    query = '''
+        SELECT sku, asin, item_id, status, attempts, error, updated_at, job_id
+        FROM ebay_listings
+    '''
+    params = []
+    if job_id:
+        query += ' WHERE job_id = ?'
+        params.append(job_id)
+    c.execute(query + ' ORDER BY updated_at DESC', params)
+    rows = c.fetchall()
+    conn.close()
+
+    return [
+        {
+            'sku': row[0],
+            'asin': row[1],
+            'item_id': row[2] or '',
+            'status': row[3],
+            'attempts': row[4],
+            'error': row[5] or '',
+            'updated_at': row[6],
+            'job_id': row[7] or ''
+        }
+        for row in rows
+    ]
+
+def missing_ebay_settings():
+    """Nazwy brakujących zmiennych EBAY_* - bez nich eBay odrzuci każdą ofertę"""
+    required = {
+        'EBAY_APPID': EBAY_APPID,
+        'EBAY_DEVID': EBAY_DEVID,
+        'EBAY_CERTID': EBAY_CERTID,
+        'EBAY_TOKEN': EBAY_TOKEN,
+        'EBAY_CATEGORY_ID': EBAY_CATEGORY_ID,
+        'EBAY_POSTAL_CODE': EBAY_POSTAL_CODE,
+        'EBAY_PAYMENT_PROFILE_ID': EBAY_PAYMENT_PROFILE_ID,
+        'EBAY_RETURN_PROFILE_ID': EBAY_RETURN_PROFILE_ID,
+        'EBAY_SHIPPING_PROFILE_ID': EBAY_SHIPPING_PROFILE_ID,
+    }
+    return [name for name, value in required.items() if not value]
+
+def build_ebay_item(product):
+    """Zbuduj payload Item (Trading API) z historii + danych z Amazon"""
+    data = fetch_amazon(product['asin'])
+    if data["title"].startswith(("[ERROR]", "[TIMEOUT]")):
+        raise ValueError(data["bullets"][0] if data["bullets"] else data["title"])
+
+    price = parse_price(product['price'] or data.get('price'))
+    if price is None:
+        raise ValueError(f"Missing or ambiguous price: {product['price'] or data.get('price')!r}")
+
+    description = product['custom_description'] or generate_listing_text(data["title"], data["meta"], data["bullets"])
+    sku = product['sku']
+
+    item = {
+        'Title': truncate_title_80(product['title'] or data["title"]),
+        'Description': "<br>".join(html_escape(line) for line in description.split("\n")),
+        'SKU': sku,
+        # eBay odrzuca drugi AddItem z tym samym UUID - chroni przed duplikatami przy retry.
+        # UUID zależy tylko od SKU, więc SKU = jedna oferta na zawsze: ponowne wystawienie
+        # zakończonej oferty wymaga nowego SKU (inaczej 488 i zapis starego ItemID).
+        'UUID': md5(sku.encode()).hexdigest().upper(),
+        'StartPrice': str(price),
+        'Currency': 'GBP',
+        'Country': 'GB',
+        'Site': 'UK',
+        'ListingType': 'FixedPriceItem',
+        'ListingDuration': 'GTC',
+        'Quantity': '1',
+        'ConditionID': '1000',
+        'DispatchTimeMax': '1',
+        'PostalCode': EBAY_POSTAL_CODE,
+        'PrimaryCategory': {'CategoryID': EBAY_CATEGORY_ID},
+        'PictureDetails': {'PictureURL': data["images"][:12]},
+        'SellerProfiles': {
+            'SellerPaymentProfile': {'PaymentProfileID': EBAY_PAYMENT_PROFILE_ID},
+            'SellerReturnProfile': {'ReturnProfileID': EBAY_RETURN_PROFILE_ID},
+            'SellerShippingProfile': {'ShippingProfileID': EBAY_SHIPPING_PROFILE_ID},
+        },
+    }
+    return item
+
+def _as_list(node):
+    """eBay zwraca pojedynczy element jako dict, a wiele jako listę"""
+    if not node:
+        return []
+    return node if isinstance(node, list) else [node]
+
+def _duplicate_item_id(error):
+    """ItemID istniejącej oferty z błędu 488 (podany w ErrorParameters)"""
+    for param in _as_list(error.get('ErrorParameters')):
+        value = str(param.get('Value') or '').strip()
+        if value.isdigit():
+            return value
+    return None
+
+def _error_text(errors):
+    return '; '.join(filter(None, (e.get('LongMessage') or e.get('ShortMessage') for e in errors)))
+
+def call_add_items(batch):
+    """Jedno wywołanie AddItems - zwraca sparsowaną odpowiedź (dict)"""
+    api = Trading(
+        domain=EBAY_DOMAIN,
+        appid=EBAY_APPID,
+        devid=EBAY_DEVID,
+        certid=EBAY_CERTID,
+        token=EBAY_TOKEN,
+        siteid=EBAY_SITE_ID,
+        config_file=None,
+        escape_xml=True,
+        errors=False,
+        timeout=EBAY_TIMEOUT
+    )
+    # Trading() wymusza https=True w konstruktorze - nadpisz dla lokalnego stuba
+    api.config.set('https', EBAY_HTTPS, force=True)
+    api.build_request('AddItems', {
+        'AddItemRequestContainer': [
+            {'MessageID': product['sku'], 'Item': item}
+            for product, item in batch
+        ]
+    }, None)
+    api.execute_request()
+
+    # Sprawdź przed parsowaniem - ebaysdk zakłada XML (np. pusty 503 z proxy go wysypie)
+    if api.response.status_code != 200:
+        raise EbayConnectionError(f"HTTP {api.response.status_code}")
+    content_type = api.response.headers.get('Content-Type', '')
+    if 'xml' not in content_type.lower():
+        raise EbayConnectionError(f"Unexpected response type: {content_type or 'none'}")
+
+    api.process_response()
+    return api.response.dict()
+
+def submit_ebay_batch(batch, job_id=None, quota_exhausted=None):
+    """Wyślij do EBAY_BATCH_SIZE ofert jednym AddItems (z ponowieniami)"""
+    results = {}
+    pending = list(batch)
+    last_error = None
+
+    for attempt in range(EBAY_MAX_RETRIES):
+        if attempt:
+            time.sleep(2 ** (attempt - 1))
+        # Limit API wyczerpany w innej partii - nie wysyłaj, tylko oznacz failed
+        if quota_exhausted is not None and quota_exhausted.is_set():
+            last_error = 'eBay API call limit reached (518) - job stopped'
+            break
+        for product, _ in pending:
+            set_listing_status(product['sku'], product['asin'], 'publishing', job_id=job_id)
+
+        try:
+            reply = call_add_items(pending)
+        except (EbayConnectionError, requests.exceptions.RequestException) as e:
+            last_error = str(e)
+            print(f"⚠️ AddItems attempt {attempt + 1}/{EBAY_MAX_RETRIES} failed: {last_error}")
+            continue
+        except Exception as e:
+            # Nieoczekiwany błąd (np. zepsuty XML) - bez retry, oferty z tej próby -> failed
+            last_error = f"Unexpected error: {e}"
+            print(f"❌ AddItems attempt {attempt + 1}/{EBAY_MAX_RETRIES}: {last_error}")
+            break
+
+        containers = {
+            container.get('CorrelationID'): container
+            for container in _as_list(reply.get('AddItemResponseContainer'))
+        }
+        top_errors = _as_list(reply.get('Errors'))
+
+        retry = []
+        for product, item in pending:
+            sku = product['sku']
+            container = containers.get(sku)
+            # Bez kontenera dla oferty liczą się błędy całego wywołania (np. limit 518)
+            errors = _as_list(container.get('Errors')) if container else top_errors
+            errors = [e for e in errors if e.get('SeverityCode') == 'Error']
+            item_id = container.get('ItemID') if container else None
+            duplicate = next((e for e in errors if e.get('ErrorCode') == '488'), None)
+            quota = next((e for e in errors if e.get('ErrorCode') == EBAY_QUOTA_ERROR), None)
+
+            if quota:
+                if quota_exhausted is not None:
+                    quota_exhausted.set()
+                error = f"eBay API call limit reached (518): {_error_text([quota])}"
+                set_listing_status(sku, product['asin'], 'failed', error=error, job_id=job_id)
+                results[sku] = 'failed'
+            elif item_id or duplicate:
+                # 488 = UUID już użyty, czyli oferta istnieje z poprzedniej próby
+                item_id = item_id or _duplicate_item_id(duplicate)
+                set_listing_status(sku, product['asin'], 'published', item_id=item_id, job_id=job_id)
+                results[sku] = 'published'
+            elif any(e.get('ErrorCode') in EBAY_RETRYABLE_ERRORS for e in errors):
+                last_error = _error_text(errors)
+                retry.append((product, item))
+            else:
+                error = _error_text(errors) or 'No response for item'
+                set_listing_status(sku, product['asin'], 'failed', error=error, job_id=job_id)
+                results[sku] = 'failed'
+
+        if retry:
+            print(f"⚠️ AddItems attempt {attempt + 1}/{EBAY_MAX_RETRIES}: {len(retry)} items hit a transient eBay error")
+        pending = retry
+        if not pending:
+            break
+
+    for product, _ in pending:
+        set_listing_status(product['sku'], product['asin'], 'failed', error=last_error, job_id=job_id)
+        results[product['sku']] = 'failed'
+    return results
+
+def publish_to_ebay(asins=None, job_id=None):
+    """Opublikuj produkty z historii na eBay partiami, równolegle"""
+    missing = missing_ebay_settings()
+    if missing:
+        raise ValueError(f"Missing eBay settings: {', '.join(missing)}")
+
+    started = time.time()
+    published_skus = get_published_skus()
+
+    candidates, seen = [], set()
+    skipped = 0
+    for product in get_publish_candidates(asins):
+        if product['sku'] in published_skus or product['sku'] in seen:
+            skipped += 1
+            continue
+        seen.add(product['sku'])
+        candidates.append(product)
+
+    def prepare(product):
+        try:
+            return product, build_ebay_item(product)
+        except ValueError as e:
+            set_listing_status(product['sku'], product['asin'], 'failed', error=str(e), job_id=job_id)
+        except Exception as e:
+            # Jeden zepsuty produkt (np. OSError z cache) nie może przerwać całego zadania
+            print(f"❌ Preparing {product['asin']} for eBay failed: {str(e)}")
+            set_listing_status(product['sku'], product['asin'], 'failed', error=f"Unexpected error: {e}", job_id=job_id)
+        return product, None
+
+    quota_exhausted = threading.Event()
+
+    def submit(batch):
+        try:
+            return submit_ebay_batch(batch, job_id=job_id, quota_exhausted=quota_exhausted)
+        except Exception as e:
+            print(f"❌ eBay batch failed: {str(e)}")
+            # Oferty już zapisane jako published zostają published
+            already_published = get_published_skus()
+            results = {}
+            for product, _ in batch:
+                if product['sku'] in already_published:
+                    results[product['sku']] = 'published'
+                    continue
+                set_listing_status(product['sku'], product['asin'], 'failed', error=f"Unexpected error: {e}", job_id=job_id)
+                results[product['sku']] = 'failed'
+            return results
+
+    with ThreadPoolExecutor(max_workers=EBAY_MAX_WORKERS) as pool:
+        prepared = list(pool.map(prepare, candidates))
+        ready = [(product, item) for product, item in prepared if item is not None]
+        batches = [ready[i:i + EBAY_BATCH_SIZE] for i in range(0, len(ready), EBAY_BATCH_SIZE)]
+
+        results = {}
+        for batch_results in pool.map(submit, batches):
+            results.update(batch_results)
+
+    published = sum(1 for status in results.values() if status == 'published')
+    elapsed = time.time() - started
+    per_minute = round(published / elapsed * 60, 1) if elapsed > 0 else 0.0
+    print(f"✓ eBay: {published} published, {len(candidates) - published} failed, {skipped} skipped in {elapsed:.1f}s ({per_minute}/min)")
+    if quota_exhausted.is_set():
+        print("⚠️ eBay API call limit (518) reached - remaining items marked failed")
+
+    return {
+        'published': published,
+        'failed': len(candidates) - published,
+        'skipped': skipped,
+        'elapsed_seconds': round(elapsed, 2),
+        'listings_per_minute': per_minute
+    }
+
+def _publish_job_heartbeat(job_id, stop):
+    """Co EBAY_JOB_HEARTBEAT s oznacz zadanie jako żywe (inaczej zostanie uznane za martwe)"""
+    while not stop.wait(EBAY_JOB_HEARTBEAT):
+        try:
+            conn = sqlite3.connect(DB_PATH, timeout=30)
+            conn.execute("UPDATE ebay_publish_jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'",
+                         (datetime.now(), job_id))
+            conn.commit()
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ Heartbeat for eBay job {job_id} failed: {str(e)}")
+
+def run_publish_job(job_id, asins):
+    """Wątek w tle: publikacja + zapis podsumowania zadania"""
+    stop = threading.Event()
+    threading.Thread(target=_publish_job_heartbeat, args=(job_id, stop), daemon=True).start()
+    try:
+        summary, error = None, None
+        try:
+            summary = publish_to_ebay(asins, job_id=job_id)
+        except Exception as e:
+            print(f"Error in eBay publish job {job_id}: {str(e)}")
+            error = str(e)
+
+        conn = sqlite3.connect(DB_PATH, timeout=30)
+        c = conn.cursor()
+        try:
+            if summary:
+                c.execute('''
+                    UPDATE ebay_publish_jobs
+                    SET status = 'done', published = ?, failed = ?, skipped = ?,
+                        elapsed_seconds = ?, listings_per_minute = ?, finished_at = ?
+                    WHERE id = ?
+                ''', (summary['published'], summary['failed'], summary['skipped'],
+                      summary['elapsed_seconds'], summary['listings_per_minute'], datetime.now(), job_id))
+            else:
+                c.execute("UPDATE ebay_publish_jobs SET status = 'error', error = ?, finished_at = ? WHERE id = ?",
+                          (error, datetime.now(), job_id))
+                # Nie zostawiaj ofert w 'publishing' po przerwanym zadaniu
+                c.execute("UPDATE ebay_listings SET status = 'failed', error = ? WHERE job_id = ? AND status = 'publishing'",
+                          (error, job_id))
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        # Bez heartbeatu zadanie, którego nie udało się zamknąć, wygaśnie po EBAY_JOB_STALE_AFTER
+        stop.set()
+
+def start_publish_job(asins=None):
+    """Uruchom publikację w tle - zwraca job_id (None jeśli inna już trwa)"""
+    job_id = uuid.uuid4().hex
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    c = conn.cursor()
+    try:
+        # Blokada zapisu na czas sprawdzenia - dwa workery nie wystartują zadań naraz
+        c.execute('BEGIN IMMEDIATE')
+        expire_stale_publish_jobs(c)
+        c.execute("SELECT id FROM ebay_publish_jobs WHERE status = 'running'")
+        if c.fetchone():
+            c.execute('COMMIT')
+            return None
+        now = datetime.now()
+        c.execute('INSERT INTO ebay_publish_jobs (id, status, started_at, heartbeat_at) VALUES (?, ?, ?, ?)',
+                  (job_id, 'running', now, now))
+        c.execute('COMMIT')
+    finally:
+        conn.close()
+
+    threading.Thread(target=run_publish_job, args=(job_id, asins), daemon=True).start()
+    return job_id
+
+def get_publish_job(job_id):
+    """Pobierz zadanie publikacji z postępem (liczba ofert wg statusu)"""
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    c = conn.cursor()
+    expire_stale_publish_jobs(c)
+    conn.commit()
+    c.execute('''
+        SELECT id, status, published, failed, skipped, elapsed_seconds,
+               listings_per_minute, error, started_at, finished_at
+        FROM ebay_publish_jobs WHERE id = ?
+    ''', (job_id,))
+    row = c.fetchone()
+    c.execute('SELECT status, COUNT(*) FROM ebay_listings WHERE job_id = ? GROUP BY status', (job_id,))
+    progress = dict(c.fetchall())
+    conn.close()
+
+    if row:
+        return {
+            'job_id': row[0],
+            'status': row[1],
+            'published': row[2],
+            'failed': row[3],
+            'skipped': row[4],
+            'elapsed_seconds': row[5],
+            'listings_per_minute': row[6],
+            'error': row[7] or '',
+            'started_at': row[8],
+            'finished_at': row[9],
+            'progress': progress
+        }
+    return None
+
+# ----------------- http cache -----------------
+
+_static_hashes = {}
+
+@app.template_global()
+def static_url(filename):
+    """URL pliku statycznego z hashem treści (cache busting)"""
+    if app.debug or filename not in _static_hashes:
+        with open(os.path.join(app.static_folder, filename), "rb") as f:
+            _static_hashes[filename] = md5(f.read()).hexdigest()[:12]
+    return url_for("static", filename=filename, v=_static_hashes[filename])
+
+def conditional_json(data, *timestamps):
+    """JSON z ETag z updated_at wierszy - 304 jeśli klient ma aktualną wersję"""
+    response = jsonify(data)
+    # Słaby ETag od razu - ten sam walidator dla 200 (często skompresowanej) i 304
+    response.set_etag(md5("|".join(str(t) for t in timestamps).encode()).hexdigest(), weak=True)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.after_request
+def cache_and_compress(response):
+    """Nagłówki cache dla /static i kompresja gzip/brotli"""
+    if request.path.startswith("/static/") and request.args.get("v"):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+
+    # best_match uwzględnia q-wartości (np. "gzip;q=0" = nie kompresuj gzipem)
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if brotli else ["gzip"])
+
+    # 304 nie ma już Content-Type, a musi mieć ten sam Vary i ETag co skompresowana 200
+    if response.status_code == 304:
+        response.vary.add("Accept-Encoding")
+        etag, weak = response.get_etag()
+        if etag and not weak and encoding:
+            response.set_etag(etag, weak=True)
+        return response
+
+    if response.status_code != 200 or response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if encoding is None or "Content-Encoding" in response.headers:
+        return response
+
+    # Treść zależy od negocjacji kodowania - ETag tylko słaby, także gdy plik za mały do kompresji
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    if encoding == "br":
+        response.set_data(brotli.compress(data, quality=5))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
 # ----------------- routes -----------------
 
 @app.route("/health")
@@ -439,8 +1084,9 @@ def save_product():
         # Aktualizuj SKU i notes
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
-        c.execute('UPDATE search_history SET sku = ?, notes = ?, timestamp = ? WHERE asin = ?', 
-                  (sku, notes, datetime.now(), asin))
+        now = datetime.now()
+        c.execute('UPDATE search_history SET sku = ?, notes = ?, timestamp = ?, updated_at = ? WHERE asin = ?', 
+                  (sku, notes, now, now, asin))
         conn.commit()
         conn.close()
         
@@ -489,6 +1135,7 @@ def delete_image():
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         c.execute('DELETE FROM product_images WHERE asin = ? AND image_path = ?', (asin, filename))
+        c.execute('UPDATE search_history SET updated_at = ? WHERE asin = ?', (datetime.now(), asin))
         conn.commit()
         conn.close()
         
@@ -512,7 +1159,7 @@ def save_description():
         
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
-        c.execute('UPDATE search_history SET custom_description = ? WHERE asin = ?', (description, asin))
+        c.execute('UPDATE search_history SET custom_description = ?, updated_at = ? WHERE asin = ?', (description, datetime.now(), asin))
         conn.commit()
         conn.close()
         
@@ -533,7 +1180,7 @@ def uploaded_file(filename):
 def api_history():
     """API endpoint do pobierania historii"""
     history = get_history_from_db(limit=50)
-    return jsonify(history)
+    return conditional_json(history, *(f"{item['asin']}:{item['timestamp']}:{item['updated_at']}" for item in history))
 
 @app.route("/api/product/<asin>")
 def api_product(asin):
@@ -541,7 +1188,7 @@ def api_product(asin):
     details = get_product_details(asin)
     if details:
         details['extra_images'] = get_product_images(asin)
-        return jsonify(details)
+        return conditional_json(details, asin, details['updated_at'])
     return jsonify({'error': 'Not found'}), 404
 
 @app.route("/clear-cache", methods=["POST"])
@@ -680,7 +1327,7 @@ def save_title():
         
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
-        c.execute('UPDATE search_history SET title = ? WHERE asin = ?', (title, asin))
+        c.execute('UPDATE search_history SET title = ?, updated_at = ? WHERE asin = ?', (title, datetime.now(), asin))
         conn.commit()
         conn.close()
         
@@ -689,5 +1336,45 @@ def save_title():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route("/publish-ebay", methods=["POST"])
+def publish_ebay():
+    """Uruchom publikację na eBay w tle (wszystkie z SKU lub wybrane ASIN)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        asins = data.get('asins')
+
+        if asins is not None and (
+            not isinstance(asins, list) or not asins
+            or not all(isinstance(asin, str) and asin.strip() for asin in asins)
+        ):
+            return jsonify({'success': False, 'error': 'asins must be a non-empty list of strings'}), 400
+
+        missing = missing_ebay_settings()
+        if missing:
+            return jsonify({'success': False, 'error': f"Missing eBay settings: {', '.join(missing)}"}), 400
+
+        job_id = start_publish_job([asin.strip() for asin in asins] if asins else None)
+        if job_id is None:
+            return jsonify({'success': False, 'error': 'Another eBay publish job is running'}), 409
+
+        return jsonify({'success': True, 'job_id': job_id}), 202
+
+    except Exception as e:
+        print(f"Error publishing to eBay: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route("/api/ebay-listings")
+def api_ebay_listings():
+    """API ze statusami publikacji na eBay (?job_id= dla jednego zadania)"""
+    return jsonify(get_listing_statuses(request.args.get('job_id')))
+
+@app.route("/api/ebay-jobs/<job_id>")
+def api_ebay_job(job_id):
+    """API ze stanem zadania publikacji"""
+    job = get_publish_job(job_id)
+    if job:
+        return jsonify(job)
+    return jsonify({'error': 'Not found'}), 404
+
 if __name__ == "__main__":
     app.run(debug=True, port=8000)
@@ -0,0 +1,155 @@
+"""Benchmark + test publikacji na eBay przez lokalny stub (scripts/ebay_stub.py).
+
+Uruchomienie (z katalogu repo):  python scripts/bench_ebay_publish.py --products 300
+
+Seeduje produkty w tymczasowym katalogu (osobna baza i cache), odpala
+/publish-ebay i sprawdza:
+- przepustowość (oferty / minutę),
+- częściowe błędy (odrzucone SKU i brak ceny -> failed, reszta published),
+- retry (503 i błąd 10007 kończą się publikacją),
+- idempotencję (drugie uruchomienie pomija wszystko, UUID -> 488),
+- limit wywołań (518 zatrzymuje zadanie, bez ponawiania, reszta -> failed).
+Kończy się kodem 1, jeśli któraś asercja nie przejdzie.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from hashlib import md5
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ebay_stub import EbayStub, make_server
+
+
+def wait_for_job(client, job_id, timeout=600):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/ebay-jobs/{job_id}").get_json()
+        if job["status"] != "running":
+            return job
+        time.sleep(0.2)
+    raise TimeoutError(f"job {job_id} still running after {timeout}s")
+
+
+def start_job(client):
+    response = client.post("/publish-ebay", json={})
+    assert response.status_code == 202, response.get_json()
+    return wait_for_job(client, response.get_json()["job_id"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.3, help="opóźnienie stuba na wywołanie AddItems (s)")
+    parser.add_argument("--rejects", type=int, default=5, help="ile SKU stub odrzuca na stałe")
+    parser.add_argument("--no-price", type=int, default=3, help="ile produktów bez ceny")
+    args = parser.parse_args()
+
+    stub = EbayStub(latency=args.latency)
+    server = make_server(stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # app czyta konfigurację i ścieżki (history.db, cache/) przy imporcie
+    os.chdir(tempfile.mkdtemp(prefix="ebay_bench_"))
+    os.environ.update({
+        "EBAY_DOMAIN": f"127.0.0.1:{server.server_address[1]}",
+        "EBAY_HTTPS": "0",
+        "EBAY_APPID": "stub", "EBAY_DEVID": "stub", "EBAY_CERTID": "stub", "EBAY_TOKEN": "stub",
+        "EBAY_CATEGORY_ID": "29223", "EBAY_POSTAL_CODE": "SW1A 1AA",
+        "EBAY_PAYMENT_PROFILE_ID": "1", "EBAY_RETURN_PROFILE_ID": "2", "EBAY_SHIPPING_PROFILE_ID": "3",
+    })
+    import app
+
+    app.MAX_HISTORY = args.products
+    rejected, no_price = set(), set()
+    for i in range(args.products):
+        asin = f"B0BENCH{i:04d}"
+        sku = f"SKU-{i:04d}"
+        price = f"£{1000 + i:,}.99"
+        if i < args.rejects:
+            sku = f"REJECT-{i:04d}"
+            rejected.add(sku)
+        elif i < args.rejects + args.no_price:
+            price = None
+            no_price.add(sku)
+        app.cache_save(md5(asin.encode()).hexdigest(), {
+            "title": f"Bench product {i} with a reasonably long Amazon title",
+            "images": [f"https://m.media-amazon.com/images/I/bench{i}.jpg"],
+            "bullets": ["Feature one", "Feature <two> & three"],
+            "meta": {"Brand": "Bench"},
+            "price": price,
+        })
+        app.save_to_history_db(asin, f"Bench product {i}", None, sku=sku, price=price)
+
+    client = app.app.test_client()
+    expected_published = args.products - len(rejected) - len(no_price)
+    flaky = {f"SKU-{i:04d}" for i in range(args.products) if str(i).endswith("7")} - rejected - no_price
+
+    # 1) pierwsze uruchomienie
+    job = start_job(client)
+    listings = {row["sku"]: row for row in client.get(f"/api/ebay-listings?job_id={job['job_id']}").get_json()}
+    assert job["status"] == "done", job
+    assert job["published"] == expected_published, job
+    assert job["failed"] == len(rejected) + len(no_price), job
+    assert all(listings[sku]["status"] == "failed" for sku in rejected | no_price)
+    assert all("ambiguous price" in listings[sku]["error"] for sku in no_price)
+    assert all(listings[sku]["status"] == "published" and listings[sku]["item_id"] for sku in flaky)
+    assert all(listings[sku]["attempts"] >= 2 for sku in flaky)
+    assert stub.http_failures > 0 and stub.transient_errors > 0
+    assert len(stub.listings) == expected_published
+
+    # 2) drugie uruchomienie: opublikowane są pomijane, do eBay idą tylko odrzucone wcześniej
+    received = stub.items_received
+    second = start_job(client)
+    assert second["published"] == 0 and second["skipped"] == expected_published, second
+    assert stub.items_received - received == len(rejected)
+
+    # 3) utracony status lokalnie -> ponowny AddItems trafia na ten sam UUID (488), bez duplikatu
+    sku = "SKU-0100"
+    item_id = listings[sku]["item_id"]
+    conn = sqlite3.connect(app.DB_PATH)
+    conn.execute("UPDATE ebay_listings SET status = 'failed', item_id = NULL WHERE sku = ?", (sku,))
+    conn.commit()
+    conn.close()
+    third = start_job(client)
+    relisted = {row["sku"]: row for row in client.get("/api/ebay-listings").get_json()}[sku]
+    assert third["published"] == 1 and relisted["status"] == "published", third
+    assert relisted["item_id"] == item_id, (relisted, item_id)
+    assert len(stub.listings) == expected_published
+
+    # 4) limit wywołań API: po 518 zadanie nie ponawia, pozostałe oferty -> failed z błędem limitu
+    relist = [f"SKU-{i:04d}" for i in range(200, 240)]
+    conn = sqlite3.connect(app.DB_PATH)
+    conn.executemany("UPDATE ebay_listings SET status = 'failed', item_id = NULL WHERE sku = ?",
+                     [(sku,) for sku in relist])
+    conn.commit()
+    conn.close()
+    attempts = {row["sku"]: row["attempts"] for row in client.get("/api/ebay-listings").get_json()}
+    stub.quota = stub.calls + 1
+    fourth = start_job(client)
+    stub.quota = None
+    rows = {row["sku"]: row for row in client.get(f"/api/ebay-listings?job_id={fourth['job_id']}").get_json()}
+    limited = [sku for sku in relist if rows[sku]["status"] == "failed"]
+    assert fourth["status"] == "done", fourth
+    assert fourth["published"] + fourth["failed"] == len(relist) + len(rejected) + len(no_price), fourth
+    assert limited and all("518" in rows[sku]["error"] for sku in limited), rows
+    assert all(rows[sku]["attempts"] - attempts[sku] <= 1 for sku in limited), rows
+    assert stub.quota_errors <= app.EBAY_MAX_WORKERS, stub.quota_errors
+
+    server.shutdown()
+    print(f"\n{args.products} products, stub latency {args.latency}s/call, "
+          f"{stub.calls} AddItems calls ({stub.http_failures} x 503, {stub.transient_errors} x 10007)")
+    print(f"published {job['published']}, failed {job['failed']} in {job['elapsed_seconds']}s "
+          f"-> {job['listings_per_minute']} listings/min")
+    print(f"call limit: {stub.quota_errors} x 518, {len(limited)} listings stopped without retry")
+    print("OK: partial failure, retry, idempotency (skip + duplicate UUID), call limit (518)")
+
+
+if __name__ == "__main__":
+    main()
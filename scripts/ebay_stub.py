@@ -0,0 +1,135 @@
+"""Lokalny stub eBay Trading API (tylko AddItems) do testów publikacji.
+
+Uruchomienie:  python scripts/ebay_stub.py --port 9011
+Potem w app:   EBAY_DOMAIN=127.0.0.1:9011 EBAY_HTTPS=0
+
+Zachowanie (deterministyczne, żeby dało się sprawdzić retry):
+- co FAIL_EVERY-te wywołanie -> HTTP 503 z pustym body (jak proxy/LB),
+  ale każda oferta dostaje 503 najwyżej raz
+- SKU kończące się na '7' -> za pierwszym razem błąd 10007 (wewnętrzny eBay)
+- SKU zaczynające się od 'REJECT' -> trwały błąd 37 (nieprawidłowe dane)
+- powtórzony UUID -> błąd 488 z ItemID istniejącej oferty w ErrorParameters
+- po przekroczeniu limitu wywołań (quota) -> błąd 518 dla całego wywołania
+"""
+import argparse
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+NS = {"e": "urn:ebay:apis:eBLBaseComponents"}
+
+
+class EbayStub:
+    def __init__(self, latency=0.0, fail_every=7, quota=None):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.quota = quota
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.http_failures = 0
+        self.transient_errors = 0
+        self.quota_errors = 0
+        self.items_received = 0
+        self.listings = {}  # UUID -> ItemID
+        self.transient_seen = set()
+        self.failed_uuids = set()
+
+    def add_items(self, body):
+        """Zwraca (status HTTP, XML odpowiedzi lub None)"""
+        time.sleep(self.latency)
+        nodes = ET.fromstring(body).findall("e:AddItemRequestContainer", NS)
+        batch_uuids = {node.findtext("e:Item/e:UUID", "", NS) for node in nodes}
+        with self.lock:
+            self.calls += 1
+            if self.quota is not None and self.calls > self.quota:
+                self.quota_errors += 1
+                return 200, ('<?xml version="1.0" encoding="UTF-8"?>'
+                             '<AddItemsResponse xmlns="urn:ebay:apis:eBLBaseComponents">'
+                             '<Ack>Failure</Ack>'
+                             + self._error("518", "Call usage limit has been reached.")
+                             + '</AddItemsResponse>')
+            # 503 najwyżej raz dla danej oferty - retry zawsze ma szansę przejść
+            if self.fail_every and self.calls % self.fail_every == 0 and not batch_uuids & self.failed_uuids:
+                self.failed_uuids |= batch_uuids
+                self.http_failures += 1
+                return 503, None
+
+            containers = []
+            for node in nodes:
+                self.items_received += 1
+                message_id = node.findtext("e:MessageID", "", NS)
+                sku = node.findtext("e:Item/e:SKU", "", NS)
+                item_uuid = node.findtext("e:Item/e:UUID", "", NS)
+                containers.append(self._container(message_id, sku, item_uuid))
+
+        xml = ('<?xml version="1.0" encoding="UTF-8"?>'
+               '<AddItemsResponse xmlns="urn:ebay:apis:eBLBaseComponents">'
+               '<Ack>Success</Ack>' + "".join(containers) + '</AddItemsResponse>')
+        return 200, xml
+
+    def _container(self, message_id, sku, item_uuid):
+        head = f"<AddItemResponseContainer><CorrelationID>{escape(message_id)}</CorrelationID>"
+        if sku.startswith("REJECT"):
+            return head + self._error("37", "Input data is invalid.") + "</AddItemResponseContainer>"
+        if sku.endswith("7") and sku not in self.transient_seen:
+            self.transient_seen.add(sku)
+            self.transient_errors += 1
+            return head + self._error("10007", "Internal error to the application.") + "</AddItemResponseContainer>"
+        if item_uuid in self.listings:
+            error = self._error("488", "Duplicate UUID used.", params=[item_uuid, self.listings[item_uuid]])
+            return head + error + "</AddItemResponseContainer>"
+
+        item_id = str(110000000000 + len(self.listings))
+        self.listings[item_uuid] = item_id
+        return head + f"<ItemID>{item_id}</ItemID></AddItemResponseContainer>"
+
+    @staticmethod
+    def _error(code, message, params=()):
+        parameters = "".join(
+            f'<ErrorParameters ParamID="{i}"><Value>{escape(value)}</Value></ErrorParameters>'
+            for i, value in enumerate(params)
+        )
+        return (f"<Errors><ShortMessage>{message}</ShortMessage><LongMessage>{message}</LongMessage>"
+                f"<ErrorCode>{code}</ErrorCode><SeverityCode>Error</SeverityCode>{parameters}</Errors>")
+
+
+def make_server(stub, host="127.0.0.1", port=0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.headers.get("X-EBAY-API-CALL-NAME") != "AddItems":
+                self.send_response(400)
+                self.end_headers()
+                return
+
+            status, xml = stub.add_items(body)
+            self.send_response(status)
+            if xml is None:
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = xml.encode("utf-8")
+            self.send_header("Content-Type", "text/xml;charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=9011)
+    parser.add_argument("--latency", type=float, default=0.0, help="opóźnienie na wywołanie (s)")
+    parser.add_argument("--fail-every", type=int, default=7, help="co które wywołanie zwraca 503 (0 = nigdy)")
+    parser.add_argument("--quota", type=int, default=None, help="po ilu wywołaniach zwracać 518")
+    args = parser.parse_args()
+
+    server = make_server(EbayStub(args.latency, args.fail_every, args.quota), port=args.port)
+    print(f"eBay stub on http://127.0.0.1:{args.port}/ws/api.dll")
+    server.serve_forever()
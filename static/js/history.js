@@ -0,0 +1,109 @@
+// Swipe to delete functionality
+document.querySelectorAll('.product-card').forEach(card => {
+    let startX = 0;
+    let currentX = 0;
+    let isDragging = false;
+    let hasTriggeredDelete = false;
+    const deleteThreshold = -100;
+
+    card.addEventListener('touchstart', (e) => {
+        if (e.target.closest('button.delete-cache-btn')) return;
+
+        startX = e.touches[0].clientX;
+        isDragging = true;
+        hasTriggeredDelete = false;
+        card.style.transition = 'none';
+    });
+
+    card.addEventListener('touchmove', (e) => {
+        if (!isDragging) return;
+
+        currentX = e.touches[0].clientX - startX;
+
+        if (currentX < 0) {
+            card.style.transform = `translateX(${currentX}px)`;
+        }
+    });
+
+    card.addEventListener('touchend', async () => {
+        if (!isDragging) return;
+        isDragging = false;
+
+        card.style.transition = 'transform 0.3s ease';
+
+        if (currentX < deleteThreshold && !hasTriggeredDelete) {
+            hasTriggeredDelete = true;
+            const asin = card.dataset.asin;
+
+            card.style.transform = 'translateX(-100%)';
+
+            setTimeout(async () => {
+                await deleteFromHistory(asin);
+                card.closest('.swipe-container').remove();
+
+                if (document.querySelectorAll('.swipe-container').length === 0) {
+                    location.reload();
+                }
+            }, 300);
+        } else {
+            card.style.transform = 'translateX(0)';
+        }
+    });
+});
+
+async function deleteFromHistory(asin) {
+    try {
+        const response = await fetch('/delete-from-history', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ asin: asin })
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            showToast('✓ Removed from history');
+        } else {
+            throw new Error(result.error || 'Delete error');
+        }
+    } catch (error) {
+        showToast('❌ Error: ' + error.message);
+    }
+}
+
+async function deleteSingleCache(asin, event) {
+    event.stopPropagation();
+    event.preventDefault();
+
+    if (!confirm('Clear cache for this product?\n\nNext search will fetch fresh data from Amazon.')) {
+        return;
+    }
+
+    try {
+        const response = await fetch('/clear-single-cache', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ asin: asin })
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            showToast('✓ Cache cleared for ' + asin);
+        } else {
+            throw new Error(result.error || 'Cache clear error');
+        }
+    } catch (error) {
+        alert('Error: ' + error.message);
+    }
+}
+
+function showToast(message) {
+    const toast = document.getElementById('toast');
+    toast.textContent = message;
+    toast.classList.add('show');
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 3000);
+}
@@ -0,0 +1,270 @@
+// VERSION 4.0 - EDITABLE TITLE + CHAR COUNTER + ENGLISH
+let selectionMode = false;
+let selectedImages = new Set();
+let uploadedFiles = [];
+
+// Character counter for title
+function updateCharCounter() {
+    const title = document.getElementById('titleEditor').value;
+    const counter = document.getElementById('charCounter');
+    const length = title.length;
+
+    counter.textContent = `${length} / 80`;
+
+    // Update color based on length
+    counter.classList.remove('ok', 'warning', 'error');
+    if (length <= 60) {
+        counter.classList.add('ok');
+    } else if (length <= 75) {
+        counter.classList.add('warning');
+    } else {
+        counter.classList.add('error');
+    }
+}
+
+// Initialize counter on load
+window.addEventListener('load', updateCharCounter);
+
+function copyTitle() {
+    const title = document.getElementById('titleEditor').value;
+    navigator.clipboard.writeText(title);
+}
+
+function copySKU() {
+    const sku = document.getElementById('skuInput').value;
+    if (sku) {
+        navigator.clipboard.writeText(sku);
+    } else {
+        alert('SKU is empty!');
+    }
+}
+
+function copyDescription() {
+    const text = document.getElementById('descriptionEditor').value;
+    navigator.clipboard.writeText(text);
+}
+
+function previewImages(event) {
+    const preview = document.getElementById('imagePreview');
+    const files = event.target.files;
+    uploadedFiles = Array.from(files);
+
+    preview.innerHTML = '';
+    for (let file of files) {
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            const img = document.createElement('img');
+            img.src = e.target.result;
+            img.className = 'extra-img-preview';
+            preview.appendChild(img);
+        };
+        reader.readAsDataURL(file);
+    }
+}
+
+async function deleteExtraImage(filename, thumbElement) {
+    if (!confirm('Delete this image?')) return;
+
+    try {
+        const response = await fetch('/delete-image', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ asin: ASIN, filename: filename })
+        });
+
+        const result = await response.json();
+        if (result.success) {
+            thumbElement.remove();
+
+            const container = document.getElementById('extraImagesContainer');
+            if (container.children.length === 0) {
+                document.getElementById('extraImagesSection').style.display = 'none';
+            }
+        }
+    } catch (error) {
+        alert('Delete error: ' + error.message);
+    }
+}
+
+async function saveProduct() {
+    try {
+        const title = document.getElementById('titleEditor').value;
+        const sku = document.getElementById('skuInput').value;
+        const notes = document.getElementById('notesInput').value;
+        const description = document.getElementById('descriptionEditor').value;
+
+        // Save title
+        await fetch('/save-title', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ asin: ASIN, title: title })
+        });
+
+        // Save description
+        await fetch('/save-description', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ asin: ASIN, description: description })
+        });
+
+        const formData = new FormData();
+        formData.append('asin', ASIN);
+        formData.append('sku', sku);
+        formData.append('notes', notes);
+
+        for (let file of uploadedFiles) {
+            formData.append('images', file);
+        }
+
+        const productResponse = await fetch('/save-product', {
+            method: 'POST',
+            body: formData
+        });
+
+        const result = await productResponse.json();
+
+        if (result.success) {
+            const msg = document.getElementById('successMessage');
+            msg.style.display = 'block';
+
+            if (result.images_saved > 0 && result.uploaded_images) {
+                const section = document.getElementById('extraImagesSection');
+                const container = document.getElementById('extraImagesContainer');
+
+                section.style.display = 'block';
+
+                result.uploaded_images.forEach(filename => {
+                    const thumb = document.createElement('div');
+                    thumb.className = 'img-thumb';
+                    thumb.dataset.filename = filename;
+                    thumb.innerHTML = `
+                        <img src="/uploads/${filename}" onclick="openExtraImageLightbox('${filename}')">
+                        <div class="delete-btn" onclick="deleteExtraImage('${filename}', this.parentElement)">✕</div>
+                    `;
+                    container.appendChild(thumb);
+                });
+            }
+
+            uploadedFiles = [];
+            document.getElementById('imagePreview').innerHTML = '';
+            document.getElementById('imageUpload').value = '';
+
+            setTimeout(() => {
+                msg.style.display = 'none';
+            }, 2000);
+        } else {
+            throw new Error(result.error || 'Unknown error');
+        }
+
+    } catch (error) {
+        alert('Save error: ' + error.message);
+    }
+}
+
+function toggleSelectionMode() {
+    selectionMode = !selectionMode;
+
+    if (selectionMode) {
+        document.querySelector('.selection-mode-btn').textContent = '✕ Cancel Selection';
+        document.getElementById('selectionCount').style.display = 'inline-block';
+
+        document.querySelectorAll('#thumbsContainer .img-thumb').forEach(thumb => {
+            thumb.onclick = function(e) {
+                e.stopPropagation();
+                toggleSelection(this);
+            };
+        });
+    } else {
+        document.querySelector('.selection-mode-btn').innerHTML = '✓ Select Images for Download <span id="selectionCount" class="selection-count" style="display:none;">0</span>';
+        selectedImages.clear();
+        document.querySelectorAll('#thumbsContainer .img-thumb').forEach(thumb => {
+            thumb.classList.remove('selected');
+            thumb.querySelector('.checkbox').textContent = '';
+            thumb.onclick = function() {
+                openLightbox(parseInt(this.dataset.index));
+            };
+        });
+        document.getElementById('downloadBtn').style.display = 'none';
+    }
+}
+
+function toggleSelection(thumb) {
+    const url = thumb.dataset.url;
+
+    if (selectedImages.has(url)) {
+        selectedImages.delete(url);
+        thumb.classList.remove('selected');
+        thumb.querySelector('.checkbox').textContent = '';
+    } else {
+        selectedImages.add(url);
+        thumb.classList.add('selected');
+        thumb.querySelector('.checkbox').textContent = '✓';
+    }
+
+    const count = selectedImages.size;
+    document.getElementById('selectionCount').textContent = count;
+    document.getElementById('downloadBtn').style.display = count > 0 ? 'block' : 'none';
+}
+
+async function downloadSelected() {
+    if (selectedImages.size === 0) return;
+
+    const formData = new FormData();
+    selectedImages.forEach(url => {
+        formData.append('selected', url);
+    });
+
+    const response = await fetch('/download-zip', {
+        method: 'POST',
+        body: formData
+    });
+
+    const blob = await response.blob();
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = 'images.zip';
+    a.click();
+}
+
+function openLightbox(index) {
+    if (selectionMode) return;
+
+    const lightbox = document.getElementById('lightbox');
+    const container = document.getElementById('lightboxImages');
+
+    lightbox.classList.add('active');
+    document.body.style.overflow = 'hidden';
+
+    container.scrollLeft = container.children[index].offsetLeft;
+    updateCounter();
+
+    container.addEventListener('scroll', updateCounter);
+}
+
+function closeLightbox() {
+    const lightbox = document.getElementById('lightbox');
+    lightbox.classList.remove('active');
+    document.body.style.overflow = 'auto';
+}
+
+function updateCounter() {
+    const container = document.getElementById('lightboxImages');
+    const index = Math.round(container.scrollLeft / container.offsetWidth);
+    const total = container.children.length;
+    document.getElementById('lightboxCounter').textContent = `${index + 1} / ${total}`;
+}
+
+async function downloadImage(url) {
+    const response = await fetch('/proxy?u=' + encodeURIComponent(url));
+    const blob = await response.blob();
+    const blobUrl = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = blobUrl;
+    a.download = 'image.jpg';
+    a.click();
+}
+
+function openExtraImageLightbox(filename) {
+    window.open('/uploads/' + filename, '_blank');
+}